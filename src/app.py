@@ -5,10 +5,14 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
+from dataclasses import dataclass
+import hashlib
+import orjson
 import os
+import threading
 from pathlib import Path
 
 app = FastAPI(title="Mergington High School API",
@@ -19,79 +23,148 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+
+@dataclass(slots=True)
+class Activity:
+    """An extracurricular activity and the emails of its participants"""
+    description: str
+    schedule: str
+    max_participants: int
+    participants: dict[str, None]
+
+
+# In-memory activity database. Participants are kept as insertion-ordered
+# dict keys so membership checks and removals are O(1).
 activities = {
-    "Chess Club": {
-        "description": "Learn strategies and compete in chess tournaments",
-        "schedule": "Fridays, 3:30 PM - 5:00 PM",
-        "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-    },
-    "Programming Class": {
-        "description": "Learn programming fundamentals and build software projects",
-        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-        "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-    },
-    "Gym Class": {
-        "description": "Physical education and sports activities",
-        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-        "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-    },
-    "Soccer Team": {
-        "description": "Join the school soccer team and compete in matches",
-        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
-        "max_participants": 22,
-        "participants": ["liam@mergington.edu", "noah@mergington.edu"]
-    },
-    "Basketball Team": {
-        "description": "Practice and play basketball with the school team",
-        "schedule": "Wednesdays and Fridays, 3:30 PM - 5:00 PM",
-        "max_participants": 15,
-        "participants": ["ava@mergington.edu", "mia@mergington.edu"]
-    },
-    "Art Club": {
-        "description": "Explore your creativity through painting and drawing",
-        "schedule": "Thursdays, 3:30 PM - 5:00 PM",
-        "max_participants": 15,
-        "participants": ["amelia@mergington.edu", "harper@mergington.edu"]
-    },
-    "Drama Club": {
-        "description": "Act, direct, and produce plays and performances",
-        "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
-        "max_participants": 20,
-        "participants": ["ella@mergington.edu", "scarlett@mergington.edu"]
-    },
-    "Math Club": {
-        "description": "Solve challenging problems and participate in math competitions",
-        "schedule": "Tuesdays, 3:30 PM - 4:30 PM",
-        "max_participants": 10,
-        "participants": ["james@mergington.edu", "benjamin@mergington.edu"]
-    },
-    "Debate Team": {
-        "description": "Develop public speaking and argumentation skills",
-        "schedule": "Fridays, 4:00 PM - 5:30 PM",
-        "max_participants": 12,
-        "participants": ["charlotte@mergington.edu", "henry@mergington.edu"]
-    },
-    "GitHub Skills": {
-        "description": "Learn practical coding and collaboration skills with GitHub - part of our GitHub Certifications program",
-        "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-        "max_participants": 25,
-        "participants": []
-    }
+    "Chess Club": Activity(
+        description="Learn strategies and compete in chess tournaments",
+        schedule="Fridays, 3:30 PM - 5:00 PM",
+        max_participants=12,
+        participants=dict.fromkeys(["michael@mergington.edu", "daniel@mergington.edu"])
+    ),
+    "Programming Class": Activity(
+        description="Learn programming fundamentals and build software projects",
+        schedule="Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        max_participants=20,
+        participants=dict.fromkeys(["emma@mergington.edu", "sophia@mergington.edu"])
+    ),
+    "Gym Class": Activity(
+        description="Physical education and sports activities",
+        schedule="Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        max_participants=30,
+        participants=dict.fromkeys(["john@mergington.edu", "olivia@mergington.edu"])
+    ),
+    "Soccer Team": Activity(
+        description="Join the school soccer team and compete in matches",
+        schedule="Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
+        max_participants=22,
+        participants=dict.fromkeys(["liam@mergington.edu", "noah@mergington.edu"])
+    ),
+    "Basketball Team": Activity(
+        description="Practice and play basketball with the school team",
+        schedule="Wednesdays and Fridays, 3:30 PM - 5:00 PM",
+        max_participants=15,
+        participants=dict.fromkeys(["ava@mergington.edu", "mia@mergington.edu"])
+    ),
+    "Art Club": Activity(
+        description="Explore your creativity through painting and drawing",
+        schedule="Thursdays, 3:30 PM - 5:00 PM",
+        max_participants=15,
+        participants=dict.fromkeys(["amelia@mergington.edu", "harper@mergington.edu"])
+    ),
+    "Drama Club": Activity(
+        description="Act, direct, and produce plays and performances",
+        schedule="Mondays and Wednesdays, 4:00 PM - 5:30 PM",
+        max_participants=20,
+        participants=dict.fromkeys(["ella@mergington.edu", "scarlett@mergington.edu"])
+    ),
+    "Math Club": Activity(
+        description="Solve challenging problems and participate in math competitions",
+        schedule="Tuesdays, 3:30 PM - 4:30 PM",
+        max_participants=10,
+        participants=dict.fromkeys(["james@mergington.edu", "benjamin@mergington.edu"])
+    ),
+    "Debate Team": Activity(
+        description="Develop public speaking and argumentation skills",
+        schedule="Fridays, 4:00 PM - 5:30 PM",
+        max_participants=12,
+        participants=dict.fromkeys(["charlotte@mergington.edu", "henry@mergington.edu"])
+    ),
+    "GitHub Skills": Activity(
+        description="Learn practical coding and collaboration skills with GitHub - part of our GitHub Certifications program",
+        schedule="Wednesdays, 3:30 PM - 5:00 PM",
+        max_participants=25,
+        participants={}
+    )
 }
 
 
+# Guards participant mutation, one lock per activity
+_activity_locks = {name: threading.Lock() for name in activities}
+_activities_json_lock = threading.Lock()
+
+
+def _serialize_activity(name):
+    """Serialize one activity as its `"name":{...}` member of the JSON object"""
+    activity = activities[name]
+    return orjson.dumps(name) + b":" + orjson.dumps({
+        "description": activity.description,
+        "schedule": activity.schedule,
+        "max_participants": activity.max_participants,
+        "participants": list(activity.participants),
+    })
+
+
+def _rebuild_activities_json(changed=None):
+    """Re-serialize the /activities body after a participant change
+
+    Only the changed activity's fragment is re-encoded; the rest are reused.
+    """
+    global _activities_cache
+    with _activities_json_lock:
+        names = activities if changed is None else (changed,)
+        for name in names:
+            _activity_fragments[name] = _serialize_activity(name)
+        body = b"{" + b",".join(_activity_fragments.values()) + b"}"
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        _activities_cache = (body, etag)
+
+
+# Serialized /activities body and its ETag, swapped as one tuple and rebuilt
+# only when participants change
+_activity_fragments = {}
+_activities_cache = (b"", "")
+_rebuild_activities_json()
+
+
+def _etag_matches(if_none_match, etag):
+    """Weakly compare an If-None-Match header against our ETag (RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
 @app.get("/activities")
-def get_activities():
-    return activities
+async def get_activities(request: Request):
+    body, etag = _activities_cache
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json",
+                    headers=headers)
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -104,15 +177,17 @@ def signup_for_activity(activity_name: str, email: str):
     # Get the specific activity
     activity = activities[activity_name]
 
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Student is already signed up"
-        )
-
-    # Add student
-    activity["participants"].append(email)
+    with _activity_locks[activity_name]:
+        # Validate student is not already signed up
+        if email in activity.participants:
+            raise HTTPException(
+                status_code=400,
+                detail="Student is already signed up"
+            )
+
+        # Add student
+        activity.participants[email] = None
+        _rebuild_activities_json(activity_name)
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
@@ -126,13 +201,24 @@ def unregister_from_activity(activity_name: str, email: str):
     # Get the specific activity
     activity = activities[activity_name]
 
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Student is not signed up for this activity"
-        )
-
-    # Remove student
-    activity["participants"].remove(email)
+    with _activity_locks[activity_name]:
+        # Validate student is signed up
+        if email not in activity.participants:
+            raise HTTPException(
+                status_code=400,
+                detail="Student is not signed up for this activity"
+            )
+
+        # Remove student
+        del activity.participants[email]
+        _rebuild_activities_json(activity_name)
     return {"message": f"Unregistered {email} from {activity_name}"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Activity data lives in process memory, so stay on a single worker.
+    # The default "auto" loop and HTTP settings pick uvloop and httptools
+    # when they are installed.
+    uvicorn.run("app:app", backlog=2048)